@@ -1,12 +1,57 @@
-from io import StringIO
+import mmap
+import re
+from functools import lru_cache
+from io import BytesIO
 from parser.peak import Peak
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
 
 import numpy as np
 import pandas as pd
-from scipy.integrate import simpson
-from scipy.signal import find_peaks, savgol_filter
+from scipy.linalg import solve_triangular
+from scipy.ndimage import convolve1d
+from scipy.signal import find_peaks, savgol_coeffs
+
+_DATA_MARKER = "Chromatogram Data:"
+
+_PEAK_DTYPE = np.dtype(
+    [
+        ("left_base", np.intp),
+        ("right_base", np.intp),
+        ("height", np.float64),
+        ("retention_time", np.float64),
+        ("area", np.float64),
+    ]
+)
+
+_SECTIONS = frozenset(
+    (
+        "Injection Information",
+        "Chromatogram Data Information",
+        "Signal Parameter Information",
+    )
+)
+
+def _scale_domain(time: np.ndarray) -> np.ndarray:
+    """
+    Maps the time axis to [-1, 1], as numpy.polynomial.Polynomial.fit does,
+    so the Vandermonde matrix stays well-conditioned for high degrees.
+    """
+    return (time - time[0]) / (time[-1] - time[0]) * 2.0 - 1.0
+
+
+@lru_cache(maxsize=64)
+def _sg_taps(window_length: int, polyorder: int) -> np.ndarray:
+    """
+    Savitzky-Golay filter taps, cached per (window_length, polyorder) and
+    shared across all Chromatogram instances.
+    """
+    return savgol_coeffs(window_length, polyorder)
+
+
+# Matches either a section header line ("<name>:") or a key/value line
+# ("<key>\t<value>") in one multiline sweep over the metadata block
+_META_RE = re.compile(r"^(?:([^\t\n]+):$|([^\t\n]+)\t([^\n]*))$", re.MULTILINE)
 
 
 class Chromatogram:
@@ -24,14 +69,17 @@ class Chromatogram:
         if not filepath.is_file():
             raise FileNotFoundError(f"No file found at {filepath}")
 
-        self.metadata: Dict[str, Dict[str, str]] = {
-            "Injection Information": {},
-            "Chromatogram Data Information": {},
-            "Signal Parameter Information": {},
-            "Other": {},
-        }
-        self.raw_data: pd.DataFrame = pd.DataFrame()
-        self.peaks: list[Peak] = []
+        self.metadata: Dict[Tuple[str, str], str] = {}
+        self.time: np.ndarray = np.empty(0)
+        self.values: np.ndarray = np.empty(0)
+        self.peaks_soa: np.ndarray = np.empty(0, dtype=_PEAK_DTYPE)
+        self._peaks: list[Peak] | None = None
+        self._columns: list[str] = []
+        self._data: np.ndarray = np.empty((0, 0))
+        self._raw_data: pd.DataFrame | None = None
+        self._vander: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._smooth_buffer: np.ndarray | None = None
+        self._peak_cache: tuple | None = None
         self._parse_file(filepath)
 
     def _parse_file(self, filepath: Path):
@@ -49,38 +97,107 @@ class Chromatogram:
         :raises ValueError: If the file content does not contain expected sections or format.
         :raises KeyError: If essential data columns are missing in the chromatogram data section.
         """
+        # Map the file instead of reading it into a Python buffer; ACCESS_COPY
+        # keeps the mapping private so the missing-value patch below only
+        # touches copy-on-write pages
         try:
-            with filepath.open("r") as file:
-                content = file.read().strip()
-        except IOError as e:
-            raise FileNotFoundError(f"Error reading file: {e}")
-
-        try:
-            metadata, data = content.split("Chromatogram Data:\n")
+            with filepath.open("rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
         except ValueError:
+            # mmap rejects empty files; an existing but empty file is a
+            # format problem, not a missing one
             raise ValueError(
                 "File format incorrect or 'Chromatogram Data:' section missing"
             )
+        except IOError as e:
+            raise FileNotFoundError(f"Error reading file: {e}")
 
-        current_section = "Other"  # TODO What if it is in the middle
-
-        for line in metadata.split("\n"):
-            if line.endswith(":"):
-                current_section = line[:-1]
-            elif line:
-                key, value = line.split("\t")
-                self.metadata[current_section][key] = value
+        try:
+            marker = _DATA_MARKER.encode()
+            marker_idx = buffer.find(marker)
+            if marker_idx == -1:
+                raise ValueError(
+                    "File format incorrect or 'Chromatogram Data:' section missing"
+                )
 
-        self.raw_data = pd.read_csv(
-            StringIO(data), sep="\t", na_values="n.a."
-        )  # TODO check other NaN
+            current_section = "Other"  # TODO What if it is in the middle
+
+            for match in _META_RE.finditer(buffer[:marker_idx].decode()):
+                section = match.group(1)
+                if section is not None:
+                    # Unknown section headers bucket their entries under "Other"
+                    current_section = section if section in _SECTIONS else "Other"
+                else:
+                    self.metadata[current_section, match.group(2)] = match.group(3)
+
+            header_start = marker_idx + len(marker) + 1
+            header_end = buffer.find(b"\n", header_start)
+            self._columns = buffer[header_start:header_end].decode().split("\t")
+
+            # Patch the instrument's missing-value token to a same-length 'nan '
+            # in place so the block can go through np.loadtxt's compiled tokenizer
+            token_idx = buffer.find(b"n.a.", header_end)  # TODO check other NaN
+            while token_idx != -1:
+                buffer[token_idx : token_idx + 4] = b"nan "
+                token_idx = buffer.find(b"n.a.", token_idx + 4)
+
+            self._data = np.loadtxt(
+                BytesIO(buffer[header_end + 1 :]),
+                delimiter="\t",
+                dtype=np.float64,
+                ndmin=2,
+            )
+        finally:
+            buffer.close()
 
         try:
-            self.raw_data["Time (min)"].to_numpy()
-            self.raw_data["Value (EU)"].to_numpy()
-        except KeyError as e:
+            # float32 is plenty for instrument noise and halves the memory
+            # bandwidth of the detection pipeline; area sums are accumulated
+            # in float64 where it matters
+            self.time = self._data[:, self._columns.index("Time (min)")].astype(
+                np.float32
+            )
+            self.values = self._data[:, self._columns.index("Value (EU)")].astype(
+                np.float32
+            )
+        except ValueError as e:
             raise ValueError(f"Expected column missing from the data: {e}")
 
+    def __copy__(self):
+        """
+        Returns a shallow copy that shares the parsed arrays and metadata but
+        has fresh detection state, so the copy can run detect_peaks without
+        touching the original. Lets callers keep one read-only parsed
+        chromatogram and hand out independent working views of it.
+        """
+        chromatogram = object.__new__(Chromatogram)
+        chromatogram.metadata = self.metadata
+        chromatogram.time = self.time
+        chromatogram.values = self.values
+        chromatogram.peaks_soa = np.empty(0, dtype=_PEAK_DTYPE)
+        chromatogram._peaks = None
+        chromatogram._columns = self._columns
+        chromatogram._data = self._data
+        chromatogram._raw_data = self._raw_data
+        # The QR cache entries depend only on the shared time axis and the
+        # degree, so copies reuse them instead of refactorizing per copy
+        chromatogram._vander = self._vander
+        chromatogram._smooth_buffer = None
+        chromatogram._peak_cache = None
+        return chromatogram
+
+    @property
+    def raw_data(self) -> pd.DataFrame:
+        """
+        The parsed chromatogram data as a pandas DataFrame.
+
+        Built lazily from the parsed numpy arrays on first access; the
+        detection and integration code reads the arrays directly.
+        """
+        if self._raw_data is None:
+            self._raw_data = pd.DataFrame(self._data, columns=self._columns)
+        return self._raw_data
+
     def detect_peaks(
         self,
         poly_degree: int = 3,
@@ -101,8 +218,92 @@ class Chromatogram:
         :param sg_window_length: Length of the window for the Savitzky-Golay filter.
         :raises ValueError: If the window size is too large for the dataset or the dataset is too short for effective smoothing.
         """
-        values = self.raw_data["Value (EU)"].to_numpy()
-        time = self.raw_data["Time (min)"].to_numpy()
+        peaks, properties = self._find_peak_indices(
+            poly_degree, min_height, prominence, peak_window_length, sg_window_length
+        )
+        self._build_peaks(peaks, properties)
+
+    @staticmethod
+    def detect_peaks_batch(
+        chromatograms: list["Chromatogram"],
+        poly_degree: int = 3,
+        min_height: float = None,
+        prominence: float = 1,
+        peak_window_length: int = 100,
+        sg_window_length: int = 25,
+    ):
+        """
+        Detects peaks in several chromatograms that share one time axis.
+
+        Chromatograms recorded with the same instrument method have identical
+        time axes, so their baselines can be fitted in a single least-squares
+        solve against one shared Vandermonde matrix instead of one solve per
+        file. Smoothing and peak picking then run per chromatogram as in
+        detect_peaks.
+
+        :param chromatograms: The chromatograms to process; their time axes must match.
+        :param poly_degree: Polynomial degree for the interpolation of the baseline.
+        :param min_height: Minimum height required for a peak to be considered.
+        :param prominence: Vertical distance from the lowest contour line to the peak.
+        :param peak_window_length: Window length in samples that limits the evaluated area for each peak.
+        :param sg_window_length: Length of the window for the Savitzky-Golay filter.
+        :raises ValueError: If the chromatograms do not share the same time axis.
+        """
+        if not chromatograms:
+            return
+        time = chromatograms[0].time
+        for chromatogram in chromatograms[1:]:
+            if not np.array_equal(chromatogram.time, time):
+                raise ValueError(
+                    "All chromatograms must share the same time axis for batch detection."
+                )
+
+        vander = np.vander(_scale_domain(time), poly_degree + 1)
+        stacked = np.column_stack([c.values for c in chromatograms])
+        coeffs, *_ = np.linalg.lstsq(vander, stacked, rcond=None)
+        baselines = vander @ coeffs
+
+        for i, chromatogram in enumerate(chromatograms):
+            peaks, properties = chromatogram._find_peak_indices(
+                poly_degree,
+                min_height,
+                prominence,
+                peak_window_length,
+                sg_window_length,
+                baseline=np.ascontiguousarray(baselines[:, i]),
+            )
+            chromatogram._build_peaks(peaks, properties)
+
+    def _find_peak_indices(
+        self,
+        poly_degree: int,
+        min_height: float,
+        prominence: float,
+        peak_window_length: int,
+        sg_window_length: int,
+        baseline: np.ndarray = None,
+    ) -> tuple[np.ndarray, dict]:
+        """
+        Runs the numeric stage of peak detection: detrending, smoothing and
+        find_peaks. Results are cached per parameter set, so repeated
+        detect_peaks calls with unchanged parameters skip the whole pipeline.
+
+        :param baseline: An optional precomputed baseline, as passed in by
+            detect_peaks_batch; fitted here when not given.
+        :return: The peak indices and the properties dict from find_peaks.
+        """
+        params = (
+            poly_degree,
+            min_height,
+            prominence,
+            peak_window_length,
+            sg_window_length,
+        )
+        if self._peak_cache is not None and self._peak_cache[0] == params:
+            return self._peak_cache[1], self._peak_cache[2]
+
+        values = self.values
+        time = self.time
         if len(values) < sg_window_length:
             raise ValueError(
                 "Window size for Savitzky-Golay filter must be less than the length of the dataset"
@@ -112,45 +313,152 @@ class Chromatogram:
                 "Window size for Savitzky-Golay filter must be must be an odd number"
             )
 
-        # Polynomial fit for detrending
-        coeffs = np.polyfit(time, values, deg=poly_degree)
-        baseline_func = np.poly1d(coeffs)
-        baseline = baseline_func(time)
-
-        # Detrending the data by subtracting the fitted polynomial baseline
-        detrended_data = values - baseline
-
-        # Apply Savitzky-Golay filter to smooth the detrended data
-        values = savgol_filter(detrended_data, sg_window_length, polyorder=3)
+        if baseline is None:
+            if poly_degree == 1:
+                # Closed-form linear fit: two reductions and two FMA-style ops
+                # instead of a full least-squares solve
+                time_centered = time - time.mean()
+                slope = np.dot(time_centered, values) / np.dot(
+                    time_centered, time_centered
+                )
+                baseline = slope * time_centered + values.mean()
+            else:
+                # Least squares via a cached QR factorization of the
+                # domain-scaled Vandermonde: refits at the same degree only
+                # pay one projection and a back-substitution
+                cached = self._vander.get(poly_degree)
+                if cached is None:
+                    vander = np.vander(_scale_domain(time), poly_degree + 1)
+                    cached = self._vander[poly_degree] = (
+                        vander,
+                        *np.linalg.qr(vander),
+                    )
+                vander, q_factor, r_factor = cached
+                coeffs = solve_triangular(r_factor, q_factor.T @ values)
+                baseline = vander @ coeffs
+
+        # Detrend into the baseline buffer instead of allocating another
+        # O(N) temporary
+        detrended_data = np.subtract(values, baseline, out=baseline)
+
+        # Smooth the detrended data with a Savitzky-Golay filter, applied as a
+        # plain convolution with coefficients cached per window length
+        sg_coeffs = _sg_taps(sg_window_length, 3)
+        if (
+            self._smooth_buffer is None
+            or self._smooth_buffer.size != detrended_data.size
+        ):
+            self._smooth_buffer = np.empty_like(detrended_data)
+        values = convolve1d(
+            detrended_data, sg_coeffs, mode="nearest", output=self._smooth_buffer
+        )
 
-        # If not specified set min height to be more than one standard deviation above the mean
+        # If not specified set min height to be more than one standard deviation
+        # above the mean, gathering both sums in a single sweep over the data
         if min_height is None:
-            mean_emission = values.mean()
-            std_emission = values.std()
+            # Accumulate in float64: summing squares of a long float32 trace
+            # in float32 loses enough precision to skew the variance
+            total = values.sum(dtype=np.float64)
+            total_sq = np.einsum("i,i->", values, values, dtype=np.float64)
+            mean_emission = total / values.size
+            std_emission = np.sqrt(total_sq / values.size - mean_emission**2)
             min_height = mean_emission + std_emission
 
-        peaks, properties = find_peaks(
-            values, height=min_height, prominence=prominence, wlen=peak_window_length
+        # Branchless vectorized scan for local-maximum candidates; when none
+        # can clear the height threshold, skip find_peaks entirely
+        interior = values[1:-1]
+        candidates = (
+            (interior > values[:-2])
+            & (interior >= values[2:])
+            & (interior >= min_height)
         )
+        if not candidates.any():
+            peaks = np.empty(0, dtype=np.intp)
+            properties = {
+                "peak_heights": np.empty(0),
+                "left_bases": np.empty(0, dtype=np.intp),
+                "right_bases": np.empty(0, dtype=np.intp),
+            }
+        else:
+            peaks, properties = find_peaks(
+                values,
+                height=min_height,
+                prominence=prominence,
+                wlen=peak_window_length,
+            )
+
+        self._peak_cache = (params, peaks, properties)
+        return peaks, properties
 
-        for i, peak in enumerate(peaks):
-            peak_height = properties["peak_heights"][i]
-            retention_time = time[peak]
+    def _build_peaks(self, peaks: np.ndarray, properties: dict):
+        """
+        Rebuilds the structure-of-arrays peak table from detected peak indices.
 
-            # Find the left and right base indices and slice the data for the peak
-            left_base_idx = properties["left_bases"][i]
-            right_base_idx = properties["right_bases"][i]
-            peak_data = self.raw_data.iloc[left_base_idx : right_base_idx + 1]
+        :param peaks: Indices of the detected peaks.
+        :param properties: The properties dict returned by find_peaks.
+        """
+        left_bases, right_bases, heights, retention_times = self._compute_peak_metrics(
+            self.time, peaks, properties
+        )
 
-            self.peaks.append(
+        self.peaks_soa = np.empty(len(peaks), dtype=_PEAK_DTYPE)
+        self.peaks_soa["left_base"] = left_bases
+        self.peaks_soa["right_base"] = right_bases
+        self.peaks_soa["height"] = heights
+        self.peaks_soa["retention_time"] = retention_times
+        # Integrate every peak while the arrays are hot: one cumulative
+        # trapezoid over the trace, differenced at the base indices
+        increments = np.diff(self.time) * (self.values[1:] + self.values[:-1]) * 0.5
+        cumulative = np.concatenate(
+            ([0.0], np.cumsum(increments, dtype=np.float64))
+        )
+        self.peaks_soa["area"] = cumulative[right_bases] - cumulative[left_bases]
+        self._peaks = None
+
+    @property
+    def peaks(self) -> list[Peak]:
+        """
+        The detected peaks as Peak objects.
+
+        Materialized lazily from the structure-of-arrays peak table; code that
+        only needs the numbers can work on peaks_soa directly without paying
+        for per-peak Python objects.
+        """
+        if self._peaks is None:
+            self._peaks = [
                 Peak(
                     left_base_idx,
                     right_base_idx,
-                    peak_height,
+                    height,
                     retention_time,
-                    peak_data,
+                    area=area,
+                    chromatogram=self,
                 )
-            )
+                # tolist() converts the whole table to native Python scalars in
+                # one pass instead of boxing numpy scalars field by field
+                for left_base_idx, right_base_idx, height, retention_time, area in self.peaks_soa.tolist()
+            ]
+        return self._peaks
+
+    @staticmethod
+    def _compute_peak_metrics(
+        time: np.ndarray, peaks: np.ndarray, properties: dict
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Computes per-peak metrics as flat arrays in one vectorized pass.
+
+        :param time: The time axis of the chromatogram.
+        :param peaks: Indices of the detected peaks.
+        :param properties: The properties dict returned by find_peaks.
+        :return: Arrays of left base indices, right base indices, heights and
+            retention times, one entry per peak.
+        """
+        return (
+            properties["left_bases"],
+            properties["right_bases"],
+            properties["peak_heights"],
+            time[peaks],
+        )
 
     def get_peaks_df(self) -> pd.DataFrame:
         """
@@ -166,28 +474,41 @@ class Chromatogram:
         :return: A pandas DataFrame with peaks data.
         """
         peaks_data = {
-            "Peak Start Measurement Id": [peak.left_base_idx for peak in self.peaks],
-            "Peak End Time Measurement Id": [
-                peak.right_base_idx for peak in self.peaks
-            ],
-            "Peak Height (EU)": [peak.height for peak in self.peaks],
-            "Retention Time (s)": [peak.retention_time for peak in self.peaks],
-            "Peak Area": [self.calculate_peak_area(peak) for peak in self.peaks],
+            "Peak Start Measurement Id": self.peaks_soa["left_base"],
+            "Peak End Time Measurement Id": self.peaks_soa["right_base"],
+            "Peak Height (EU)": self.peaks_soa["height"],
+            "Retention Time (s)": self.peaks_soa["retention_time"],
+            "Peak Area": self.calculate_peak_areas(),
         }
         return pd.DataFrame(peaks_data)
 
+    def calculate_peak_areas(self) -> np.ndarray:
+        """
+        Returns the areas of all detected peaks as one array.
+
+        The areas are integrated once during detect_peaks, so this is a plain
+        read of the peak table.
+
+        :return: An array with one area per detected peak.
+        """
+        return self.peaks_soa["area"]
+
     @staticmethod
     def calculate_peak_area(peak: Peak) -> float:
         """
-        Calculates the area under the curve for a given peak using Simpson's rule.
+        Calculates the area under the curve for a given peak using the trapezoidal rule.
 
         :param peak: The Peak object for which to calculate the area.
         :return: The calculated area under the curve.
         :raises ValueError: If the peak data is empty.
         """
+        if peak.area is not None:
+            return peak.area
         if peak.data.empty:
             raise ValueError("Peak data is empty, cannot calculate area.")
-        area = simpson(y=peak.data["Value (EU)"], x=peak.data["Time (min)"])
+        area = np.trapz(
+            peak.data["Value (EU)"].to_numpy(), x=peak.data["Time (min)"].to_numpy()
+        )
         return area
 
     @staticmethod
@@ -205,6 +526,21 @@ class Chromatogram:
         elution_volume = peak.retention_time * flow_rate
         return elution_volume
 
+    def calculate_elution_volumes(self, flow_rate: float) -> np.ndarray:
+        """
+        Calculates the elution volumes of all detected peaks at once.
+
+        A single vectorized multiply over the peak table instead of one
+        Python call per peak.
+
+        :param flow_rate: The flow rate used in the experiment, must be a positive number.
+        :return: An array with one elution volume per detected peak.
+        :raises ValueError: If the flow rate is not a positive number.
+        """
+        if flow_rate <= 0:
+            raise ValueError("Flow rate must be a positive number.")
+        return self.peaks_soa["retention_time"] * flow_rate
+
 
 if __name__ == "__main__":
     filepath = Path(__file__).parent.parent / "data" / "IgG Vtag 1_ACQUITY FLR ChA.txt"
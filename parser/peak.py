@@ -5,30 +5,70 @@ class Peak:
     """
     Represents a chromatographic peak.
 
+    Only the index range and scalar metrics are stored per peak; the data
+    points are sliced lazily from the parent chromatogram on first access
+    instead of keeping a DataFrame copy per peak.
+
     :param left_base_idx: The left index (start) of the detected peak.
     :param right_base_idx: The right index (end) of the detected peak.
     :param height: The height of the peak.
     :param retention_time: The retention time at which the peak occurs.
-    :param data: A pandas DataFrame containing the data points of the peak.
+    :param data: An optional pandas DataFrame with the data points of the peak,
+        for peaks constructed without a parent chromatogram.
+    :param area: The area under the peak, if already computed during detection.
+    :param chromatogram: The Chromatogram the peak was detected in, used to
+        slice the peak data on demand.
+    :raises ValueError: If neither data nor chromatogram is supplied.
     """
 
+    __slots__ = (
+        "left_base_idx",
+        "right_base_idx",
+        "height",
+        "retention_time",
+        "area",
+        "_data",
+        "_chromatogram",
+    )
+
     def __init__(
         self,
         left_base_idx: float,
         right_base_idx: float,
         height: float,
         retention_time: float,
-        data: pd.DataFrame,
+        data: pd.DataFrame = None,
+        area: float = None,
+        chromatogram=None,
     ):
+        if data is None and chromatogram is None:
+            raise ValueError(
+                "Peak requires either data or a parent chromatogram to slice it from"
+            )
         self.left_base_idx = left_base_idx
         self.right_base_idx = right_base_idx
         self.height = height
         self.retention_time = retention_time
-        self.data = data
+        self.area = area
+        self._data = data
+        self._chromatogram = chromatogram
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        The data points of the peak as a pandas DataFrame.
+
+        Sliced from the parent chromatogram on first access.
+        """
+        if self._data is None and self._chromatogram is not None:
+            self._data = self._chromatogram.raw_data.iloc[
+                self.left_base_idx : self.right_base_idx + 1
+            ]
+        return self._data
 
     def __repr__(self):
         return (
-            f"Peak(left_thresh={self.left_thresh}, right_thresh={self.right_thresh}, "
+            f"Peak(left_base_idx={self.left_base_idx}, right_base_idx={self.right_base_idx}, "
             f"height={self.height}, retention_time={self.retention_time}, "
             f"data=[{self.data.to_string(index=False)}])"
         )
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from copy import copy
 from pathlib import Path
 import os
 
@@ -9,6 +10,19 @@ from parser.chromatogram import Chromatogram
 st.set_page_config(layout="wide")
 
 
+@st.cache_resource(show_spinner=False)
+def shared_chromatogram(path: str) -> Chromatogram:
+    # One parsed chromatogram per file, shared read-only across all sessions
+    return Chromatogram(Path(path))
+
+
+def load_chromatogram(path: str) -> Chromatogram:
+    # Per-session working view: shares the parsed arrays of the cached
+    # instance but detects peaks independently, so moving a slider neither
+    # re-parses the file nor interferes with other sessions
+    return copy(shared_chromatogram(path))
+
+
 def plot_processed_data(data, peaks):
     fig = px.line(data, x='Time (min)', y='Value (EU)', title='Peaks')
     # Plotting peaks with the data from Peak instances
@@ -51,7 +65,7 @@ with plot:
     # File processing
     if file_selector:
         data_path = Path(data_dir) / file_selector
-        chromatogram = Chromatogram(data_path)
+        chromatogram = load_chromatogram(str(data_path))
         chromatogram.detect_peaks(poly_degree=poly_degree, min_height=min_height, prominence=prominence,
                                   peak_window_length=peak_window_length,
                                   sg_window_length=sg_window_length)
@@ -1,6 +1,7 @@
 from parser.peak import Peak
 
 import pandas as pd
+import pytest
 
 sample_data = pd.DataFrame({
     'Time (min)': [0.0, 0.5, 1.0, 1.5, 2.0],
@@ -9,9 +10,14 @@ sample_data = pd.DataFrame({
 
 
 def test_peak_init():
-    peak = Peak(left_thresh=0.0, right_base_idx=2.0, height=20, retention_time=1.0, data=sample_data)
-    assert peak.left_thresh == 0.0
-    assert peak.right_thresh == 2.0
+    peak = Peak(left_base_idx=0, right_base_idx=2, height=20, retention_time=1.0, data=sample_data)
+    assert peak.left_base_idx == 0
+    assert peak.right_base_idx == 2
     assert peak.height == 20
     assert peak.retention_time == 1.0
     assert peak.data.equals(sample_data)
+
+
+def test_peak_requires_data_or_chromatogram():
+    with pytest.raises(ValueError):
+        Peak(left_base_idx=0, right_base_idx=2, height=20, retention_time=1.0)